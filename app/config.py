@@ -18,6 +18,7 @@ class Settings(BaseSettings):
     
     # Logging
     log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR"] = "INFO"
+    request_log_batching: bool = False  # Batched per-request logs via RequestResponseInterceptor
     
     # Model Configuration
     model_version: str = "mock-v1.0"
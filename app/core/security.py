@@ -82,8 +82,8 @@ def mask_sensitive_data(text: str) -> str:
     # Mask phone numbers
     text = re.sub(r'0\d{1,2}[-.\s]?\d{3}[-.\s]?\d{4}', '08X-XXX-XXXX', text)
     
-    # Mask URLs
-    text = re.sub(r'https?://[^\s]+', 'https://[MASKED_URL]', text)
+    # Mask URLs (stop at quotes so compact JSON keeps its other fields)
+    text = re.sub(r'https?://[^\s"]+', 'https://[MASKED_URL]', text)
     
     # Mask email
     text = re.sub(r'[\w\.-]+@[\w\.-]+\.\w+', '[MASKED_EMAIL]', text)
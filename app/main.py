@@ -28,11 +28,15 @@ from app.tasks.adaptive_security import run_promote_threats_task
 # Initialize Scheduler
 scheduler = BackgroundScheduler()
 
+# Batched request completion logs (drained in the background, see lifespan)
+from app.utils.interceptors import RequestLogBuffer, RequestResponseInterceptor
+request_log_buffer = RequestLogBuffer()
+
 # Admin User Creation
 def create_default_admin():
     from app.database import SessionLocal
     from app.models.database import User, UserRole
-    from app.routes.auth import hash_password
+    from app.utils.jwt_utils import hash_password
     import os as local_os
     
     db = SessionLocal()
@@ -78,6 +82,9 @@ async def lifespan(app):
         scheduler.start()
         logger.info("⏰ Adaptive Security Scheduler started (Every 60 mins)")
     
+    if settings.request_log_batching:
+        request_log_buffer.start()
+    
     yield
     
     # Shutdown
@@ -85,6 +92,7 @@ async def lifespan(app):
     if scheduler.running:
         scheduler.shutdown()
         logger.info("⏰ Scheduler shut down")
+    await request_log_buffer.stop()
 
 # Create FastAPI application
 app = FastAPI(
@@ -214,6 +222,10 @@ app.add_middleware(SecurityMiddleware)
 from app.middleware.monitoring import MonitoringMiddleware
 app.add_middleware(MonitoringMiddleware)
 
+# Optional structured request logs, batched into request_log_buffer
+if settings.request_log_batching:
+    app.add_middleware(RequestResponseInterceptor, log_buffer=request_log_buffer)
+
 # Add cache control middleware to prevent browser caching issues
 from app.middleware.cache_control import CacheControlMiddleware
 app.add_middleware(CacheControlMiddleware)
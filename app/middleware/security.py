@@ -27,6 +27,10 @@ class SecurityMiddleware(BaseHTTPMiddleware):
         r'<embed',  # embeds
     ]
     
+    # Every blocked pattern needs at least one of these characters, so
+    # messages without any of them can skip the regex scan entirely
+    BLOCKED_TRIGGER_CHARS = ('<', ':', '=', '(')
+    
     async def dispatch(self, request: Request, call_next):
         """
         Process request through security checks
@@ -65,6 +69,13 @@ class SecurityMiddleware(BaseHTTPMiddleware):
         return response
 
 
+# All blocked patterns as one alternation; group N is BLOCKED_PATTERNS[N - 1]
+_BLOCKED_RE = re.compile(
+    "|".join(f"({pattern})" for pattern in SecurityMiddleware.BLOCKED_PATTERNS),
+    re.IGNORECASE | re.DOTALL
+)
+
+
 def validate_message_content(message: str) -> None:
     """
     Validate and sanitize message content
@@ -90,9 +101,11 @@ def validate_message_content(message: str) -> None:
             detail="Message cannot be empty"
         )
     
-    # Check for suspicious patterns
-    for pattern in SecurityMiddleware.BLOCKED_PATTERNS:
-        if re.search(pattern, message, re.IGNORECASE | re.DOTALL):
+    # Check for suspicious patterns (one pass over the message)
+    if any(c in message for c in SecurityMiddleware.BLOCKED_TRIGGER_CHARS):
+        match = _BLOCKED_RE.search(message)
+        if match:
+            pattern = SecurityMiddleware.BLOCKED_PATTERNS[match.lastindex - 1]
             logger.warning(f"Suspicious content detected: pattern={pattern}")
             raise HTTPException(
                 status_code=400,
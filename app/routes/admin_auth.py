@@ -5,8 +5,7 @@ from app.utils.jwt_utils import (
     create_access_token,
     create_refresh_token,
     verify_refresh_token,
-    verify_password,
-    hash_password
+    verify_password_async
 )
 from app.config import settings
 import logging
@@ -85,7 +84,7 @@ async def admin_login(credentials: LoginRequest) -> TokenResponse:
     # Verify password
     # If admin_password_hash is not set, use the static token as password (backward compat)
     if settings.admin_password_hash:
-        if not verify_password(credentials.password, settings.admin_password_hash):
+        if not await verify_password_async(credentials.password, settings.admin_password_hash):
             logger.warning(f"Invalid password for admin user: {credentials.username}")
             raise HTTPException(
                 status_code=401,
@@ -17,7 +17,7 @@ from app.database import get_db
 from app.models.database import User, UserRole
 from app.config import settings
 from app.middleware.auth import verify_admin_token
-from app.utils.jwt_utils import create_access_token, verify_password, hash_password
+from app.utils.jwt_utils import create_access_token, verify_password_async, hash_password_async
 
 logger = logging.getLogger(__name__)
 
@@ -82,7 +82,7 @@ class UpdateUserRequest(BaseModel):
 @router.post("/login", response_model=LoginResponse)
 async def login(request: LoginRequest, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == request.email).first()
-    if not user or not verify_password(request.password, user.password_hash):
+    if not user or not await verify_password_async(request.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -162,7 +162,7 @@ async def create_user(
             logger.info(f"Generated password for {request.email}")
 
         # Hash password
-        password_hash = hash_password(plain_password)
+        password_hash = await hash_password_async(plain_password)
         
         # Create user
         user = User(
@@ -400,7 +400,7 @@ async def reset_password(
     alphabet = string.ascii_letters + string.digits + "!@#$%^&*"
     plain_password = ''.join(secrets.choice(alphabet) for i in range(12))
     
-    user.password_hash = hash_password(plain_password)
+    user.password_hash = await hash_password_async(plain_password)
     
     log_action(
         db,
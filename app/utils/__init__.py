@@ -5,7 +5,8 @@ from app.utils.logging import get_logger, log_execution_time, StructuredLogger
 from app.utils.interceptors import (
     RequestResponseInterceptor,
     ResponseValidationInterceptor,
-    DebugRequestInterceptor
+    DebugRequestInterceptor,
+    RequestLogBuffer
 )
 from app.utils.performance import (
     get_performance_monitor,
@@ -23,6 +24,7 @@ __all__ = [
     "RequestResponseInterceptor",
     "ResponseValidationInterceptor",
     "DebugRequestInterceptor",
+    "RequestLogBuffer",
     
     # Performance
     "get_performance_monitor",
@@ -1,6 +1,7 @@
 
 import logging
 import smtplib
+from html import escape
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from typing import Optional
@@ -9,6 +10,29 @@ from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Welcome email body, built once at import. Only the per-user fields are
+# filled in at send time; they are HTML-escaped before insertion.
+_LOGIN_URL = f"https://{settings.domain_name}/admin/login"
+_WELCOME_EMAIL_TEMPLATE = f"""
+        <html>
+          <body style="font-family: Arial, sans-serif; padding: 20px;">
+            <h2>Welcome to ThaiScamDetector!</h2>
+            <p>Hello {{name}},</p>
+            <p>Your account has been created successfully.</p>
+            <p><strong>Your Login Credentials:</strong></p>
+            <ul>
+                <li><strong>Email:</strong> {{email}}</li>
+                <li><strong>Password:</strong> {{password}}</li>
+            </ul>
+            <p>Please log in at: <a href="{_LOGIN_URL}">{_LOGIN_URL}</a></p>
+            <p>We recommend changing your password after your first login.</p>
+            <br>
+            <p>Best regards,</p>
+            <p>The ThaiScamDetector Team</p>
+          </body>
+        </html>
+        """
+
 async def send_new_user_email(email: EmailStr, password: str, name: Optional[str] = None):
     """
     Send welcome email to new user with their credentials using smtplib.
@@ -27,25 +51,11 @@ async def send_new_user_email(email: EmailStr, password: str, name: Optional[str
         msg["From"] = settings.mail_from
         msg["To"] = email
 
-        html = f"""
-        <html>
-          <body style="font-family: Arial, sans-serif; padding: 20px;">
-            <h2>Welcome to ThaiScamDetector!</h2>
-            <p>Hello {name or 'User'},</p>
-            <p>Your account has been created successfully.</p>
-            <p><strong>Your Login Credentials:</strong></p>
-            <ul>
-                <li><strong>Email:</strong> {email}</li>
-                <li><strong>Password:</strong> {password}</li>
-            </ul>
-            <p>Please log in at: <a href="https://{settings.domain_name}/admin/login">https://{settings.domain_name}/admin/login</a></p>
-            <p>We recommend changing your password after your first login.</p>
-            <br>
-            <p>Best regards,</p>
-            <p>The ThaiScamDetector Team</p>
-          </body>
-        </html>
-        """
+        html = _WELCOME_EMAIL_TEMPLATE.format(
+            name=escape(name or "User"),
+            email=escape(email),
+            password=escape(password),
+        )
         msg.attach(MIMEText(html, "html"))
 
         # Connect to SMTP Server
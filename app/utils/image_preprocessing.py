@@ -4,12 +4,55 @@ Image preprocessing utilities for enhanced OCR accuracy
 import cv2
 import numpy as np
 import logging
+import threading
 from typing import Optional, Tuple
 from PIL import Image
 import io
 
 logger = logging.getLogger(__name__)
 
+# Large images are routed through OpenCV's Transparent API (cv2.UMat), which
+# dispatches CLAHE / thresholding to OpenCL when a device is available.
+# UMat upload/download costs ~1 ms, so small images stay on the CPU path.
+UMAT_MIN_PIXELS = 1_000_000
+_HAVE_OPENCL = cv2.ocl.haveOpenCL()
+
+# 3x3 sharpening kernel, prebuilt as float32 (the type filter2D uses)
+_SHARPEN_KERNEL = np.array([[-1, -1, -1],
+                            [-1,  9, -1],
+                            [-1, -1, -1]], dtype=np.float32)
+
+
+# Per-thread scratch buffers reused across preprocess_for_ocr calls, one per
+# pipeline stage. A buffer is reallocated only when the image shape changes.
+_scratch = threading.local()
+
+
+def _scratch_buffer(stage: str, shape: Tuple[int, ...]) -> np.ndarray:
+    """Get this thread's uint8 scratch buffer for a pipeline stage."""
+    pool = getattr(_scratch, "pool", None)
+    if pool is None:
+        pool = _scratch.pool = {}
+    
+    buf = pool.get(stage)
+    if buf is None or buf.shape != shape:
+        buf = pool[stage] = np.empty(shape, dtype=np.uint8)
+    return buf
+
+
+def _to_device(img: np.ndarray):
+    """Wrap large images in a cv2.UMat when OpenCL is available."""
+    if _HAVE_OPENCL and img.shape[0] * img.shape[1] >= UMAT_MIN_PIXELS:
+        return cv2.UMat(img)
+    return img
+
+
+def _to_host(img) -> np.ndarray:
+    """Download a cv2.UMat result back to a numpy array."""
+    if isinstance(img, cv2.UMat):
+        return img.get()
+    return img
+
 
 def preprocess_for_ocr(image_content: bytes, auto_rotate: bool = True) -> bytes:
     """
@@ -31,41 +74,46 @@ def preprocess_for_ocr(image_content: bytes, auto_rotate: bool = True) -> bytes:
     """
     try:
         # Convert bytes to numpy array
+        # 1. Decode straight to grayscale (no 3-channel intermediate)
         nparr = np.frombuffer(image_content, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        gray = cv2.imdecode(nparr, cv2.IMREAD_GRAYSCALE)
         
-        if img is None:
+        if gray is None:
             logger.warning("Failed to decode image for preprocessing")
             return image_content
         
-        # 1. Convert to grayscale
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        # Intermediate results are written into reusable scratch buffers
+        shape = gray.shape[:2]
         
         # 2. Denoise (reduce noise while preserving edges)
-        denoised = cv2.fastNlMeansDenoising(gray, h=10)
+        denoised = cv2.fastNlMeansDenoising(gray, dst=_scratch_buffer("denoised", shape), h=10)
         
         # 3. Sharpen (enhance text edges)
-        kernel = np.array([[-1, -1, -1],
-                          [-1,  9, -1],
-                          [-1, -1, -1]])
-        sharpened = cv2.filter2D(denoised, -1, kernel)
+        sharpened = cv2.filter2D(denoised, -1, _SHARPEN_KERNEL, dst=_scratch_buffer("sharpened", shape))
         
         # 4. Adaptive thresholding (better for varying lighting)
         # This converts to binary image (black text on white background)
-        binary = cv2.adaptiveThreshold(
-            sharpened,
-            255,
-            cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-            cv2.THRESH_BINARY,
-            11,  # Block size
-            2    # Constant subtracted from mean
-        )
+        src = _to_device(sharpened)
+        if isinstance(src, cv2.UMat):
+            binary = _to_host(cv2.adaptiveThreshold(
+                src, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
+            ))
+        else:
+            binary = cv2.adaptiveThreshold(
+                src,
+                255,
+                cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                cv2.THRESH_BINARY,
+                11,  # Block size
+                2,   # Constant subtracted from mean
+                dst=_scratch_buffer("binary", shape)
+            )
         
         # 5. Optional: Auto-rotate if text is upside down or sideways
         if auto_rotate:
             binary = _auto_rotate_image(binary)
         
-        # Convert back to bytes
+        # Convert back to bytes (copies out of the scratch buffers)
         success, buffer = cv2.imencode('.png', binary)
         if not success:
             logger.warning("Failed to encode preprocessed image")
@@ -102,7 +150,7 @@ def enhance_contrast(image_content: bytes) -> bytes:
         
         # Create CLAHE object
         clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        enhanced = clahe.apply(img)
+        enhanced = _to_host(clahe.apply(_to_device(img)))
         
         # Convert back to bytes
         success, buffer = cv2.imencode('.png', enhanced)
@@ -3,9 +3,11 @@ Request/Response Interceptors
 
 Middleware for logging and debugging API requests and responses.
 """
+import asyncio
+import secrets
 import time
-import json
-from typing import Callable
+from typing import Callable, List, Optional
+import orjson
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
@@ -14,6 +16,98 @@ from app.utils.logging import get_logger
 from app.core.security import mask_sensitive_data
 
 logger = get_logger("interceptor")
+batch_logger = get_logger("interceptor.batch")
+
+
+class RequestLogBuffer:
+    """
+    Column-oriented buffer of completed-request log records
+    
+    Each field is kept in its own list (structure of arrays), and records
+    are emitted together as a single structured log line once the buffer
+    fills up or the flush interval has elapsed. The interval is enforced by
+    a drain task between ``start()`` and ``stop()`` (tie these to the app
+    lifespan), so the tail of a burst is written even when traffic stops.
+    """
+    
+    FIELDS = ("request_id", "method", "path", "status_code", "duration_ms")
+    
+    def __init__(self, max_records: int = 256, flush_interval: float = 0.1):
+        self.max_records = max_records
+        self.flush_interval = flush_interval
+        self._drain_task: Optional[asyncio.Task] = None
+        self._reset()
+    
+    def _reset(self):
+        self._request_ids: List[str] = []
+        self._methods: List[str] = []
+        self._paths: List[str] = []
+        self._status_codes: List[int] = []
+        self._durations_ms: List[float] = []
+        self._last_flush = time.monotonic()
+    
+    def __len__(self) -> int:
+        return len(self._request_ids)
+    
+    def append(
+        self,
+        request_id: str,
+        method: str,
+        path: str,
+        status_code: int,
+        duration_ms: float
+    ):
+        """Buffer one record, flushing if the batch is full or stale"""
+        self._request_ids.append(request_id)
+        self._methods.append(method)
+        self._paths.append(path)
+        self._status_codes.append(status_code)
+        self._durations_ms.append(duration_ms)
+        
+        if (
+            len(self._request_ids) >= self.max_records
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+    
+    def flush(self):
+        """Emit all buffered records as one log line"""
+        if not self._request_ids:
+            return
+        
+        records = dict(zip(self.FIELDS, (
+            self._request_ids,
+            self._methods,
+            self._paths,
+            self._status_codes,
+            self._durations_ms
+        )))
+        count = len(self._request_ids)
+        self._reset()
+        
+        batch_logger.info("Requests completed", count=count, records=records)
+    
+    def start(self):
+        """Start the background drain task on the running event loop"""
+        if self._drain_task is None:
+            self._drain_task = asyncio.get_running_loop().create_task(self._drain())
+    
+    async def stop(self):
+        """Stop the drain task and flush whatever is still buffered"""
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+            try:
+                await self._drain_task
+            except asyncio.CancelledError:
+                pass
+            self._drain_task = None
+        self.flush()
+    
+    async def _drain(self):
+        """Flush buffered records every flush interval"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
 
 
 class RequestResponseInterceptor(BaseHTTPMiddleware):
@@ -25,17 +119,25 @@ class RequestResponseInterceptor(BaseHTTPMiddleware):
     - Logs response details (status, timing)
     - Masks sensitive data
     - Tracks request IDs for correlation
+    - Optionally batches completion logs into ``log_buffer``; the owner
+      of the buffer starts and stops it with the app lifespan
     """
     
-    def __init__(self, app: ASGIApp, log_body: bool = False):
+    def __init__(
+        self,
+        app: ASGIApp,
+        log_body: bool = False,
+        log_buffer: Optional[RequestLogBuffer] = None
+    ):
         super().__init__(app)
         self.log_body = log_body
+        self.log_buffer = log_buffer
     
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         """Intercept request and response"""
         
         # Generate request ID
-        request_id = request.headers.get("X-Request-ID", f"req-{int(time.time()*1000)}")
+        request_id = request.headers.get("X-Request-ID") or f"req-{secrets.token_hex(8)}"
         
         # Set logger context
         logger.set_context(
@@ -56,19 +158,27 @@ class RequestResponseInterceptor(BaseHTTPMiddleware):
         logger.info("Incoming request", **request_data)
         
         # Process request
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         try:
             response = await call_next(request)
-            duration = time.time() - start_time
+            duration_ms = (time.perf_counter_ns() - start_ns) / 1e6
             
             # Log response
-            response_data = {
-                "status_code": response.status_code,
-                "duration_ms": round(duration * 1000, 2)
-            }
-            
-            logger.info("Request completed", **response_data)
+            if self.log_buffer is not None:
+                self.log_buffer.append(
+                    request_id,
+                    request.method,
+                    request.url.path,
+                    response.status_code,
+                    round(duration_ms, 2)
+                )
+            else:
+                logger.info(
+                    "Request completed",
+                    status_code=response.status_code,
+                    duration_ms=round(duration_ms, 2)
+                )
             
             # Add request ID to response headers
             response.headers["X-Request-ID"] = request_id
@@ -76,12 +186,12 @@ class RequestResponseInterceptor(BaseHTTPMiddleware):
             return response
             
         except Exception as e:
-            duration = time.time() - start_time
+            duration_ms = (time.perf_counter_ns() - start_ns) / 1e6
             
             logger.error(
                 "Request failed",
                 error=str(e),
-                duration_ms=round(duration * 1000, 2)
+                duration_ms=round(duration_ms, 2)
             )
             
             raise
@@ -143,9 +253,9 @@ class DebugRequestInterceptor(BaseHTTPMiddleware):
                 body = await request.body()
                 if body:
                     try:
-                        body_json = json.loads(body)
-                        # Mask sensitive fields
-                        masked_body = mask_sensitive_data(json.dumps(body_json))
+                        body_json = orjson.loads(body)
+                        # Mask sensitive fields (only the part we print)
+                        masked_body = mask_sensitive_data(orjson.dumps(body_json).decode()[:1024])
                         print(f"Body: {masked_body[:200]}...")
                     except:
                         print(f"Body: {body[:100]}... (binary)")
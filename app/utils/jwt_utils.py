@@ -1,13 +1,90 @@
 """JWT token utilities for admin authentication"""
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, UTC
 from typing import Optional, Dict, Any
-from jose import JWTError, jwt
+import jwt
 import bcrypt  # Direct bcrypt usage
 from app.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Dedicated pool for bcrypt work (~250 ms per call at the default cost) so it
+# neither blocks the event loop nor starves the default executor.
+_password_executor = ThreadPoolExecutor(
+    max_workers=min(8, os.cpu_count() or 1),
+    thread_name_prefix="bcrypt"
+)
+
+# Settings are immutable after startup; read the signing parameters once
+_JWT_SECRET_KEY = settings.jwt_secret_key
+_JWT_ALGORITHM = settings.jwt_algorithm
+_JWT_ALGORITHMS = [_JWT_ALGORITHM]
+_JWT_DECODE_OPTIONS = {"require": ["exp", "iat", "type"]}
+
+
+class VerifiedTokenCache:
+    """
+    Short-lived LRU cache of successfully verified token payloads
+    
+    Keyed by the SHA-256 digest of the token so raw credentials are never
+    retained. Each entry lives for at most ``ttl`` seconds and never past
+    the token's own ``exp`` claim.
+    """
+    
+    def __init__(self, maxsize: int = 10_000, ttl: float = 5.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+    
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached payload, or None on miss/expiry"""
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return dict(payload)
+    
+    def put(self, token: str, payload: Dict[str, Any]):
+        """Cache a verified payload"""
+        expires_at = time.time() + self.ttl
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+        
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, dict(payload))
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop all cached entries"""
+        with self._lock:
+            self._entries.clear()
+
+
+_access_token_cache = VerifiedTokenCache()
+_refresh_token_cache = VerifiedTokenCache()
+
 
 def create_access_token(
     data: Dict[str, Any],
@@ -24,24 +101,25 @@ def create_access_token(
         Encoded JWT token
     """
     to_encode = data.copy()
+    now = datetime.now(UTC)
     
     if expires_delta:
-        expire = datetime.now(UTC) + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.now(UTC) + timedelta(
+        expire = now + timedelta(
             minutes=settings.access_token_expire_minutes
         )
     
     to_encode.update({
         "exp": expire,
-        "iat": datetime.now(UTC),
+        "iat": now,
         "type": "access"
     })
     
     encoded_jwt = jwt.encode(
         to_encode,
-        settings.jwt_secret_key,
-        algorithm=settings.jwt_algorithm
+        _JWT_SECRET_KEY,
+        algorithm=_JWT_ALGORITHM
     )
     
     return encoded_jwt
@@ -60,18 +138,19 @@ def create_refresh_token(
         Encoded JWT refresh token
     """
     to_encode = data.copy()
-    expire = datetime.now(UTC) + timedelta(days=settings.refresh_token_expire_days)
+    now = datetime.now(UTC)
+    expire = now + timedelta(days=settings.refresh_token_expire_days)
     
     to_encode.update({
         "exp": expire,
-        "iat": datetime.now(UTC),
+        "iat": now,
         "type": "refresh"
     })
     
     encoded_jwt = jwt.encode(
         to_encode,
-        settings.jwt_secret_key,
-        algorithm=settings.jwt_algorithm
+        _JWT_SECRET_KEY,
+        algorithm=_JWT_ALGORITHM
     )
     
     return encoded_jwt
@@ -87,11 +166,16 @@ def verify_access_token(token: str) -> Optional[Dict[str, Any]]:
     Returns:
         Decoded token payload if valid, None otherwise
     """
+    cached = _access_token_cache.get(token)
+    if cached is not None:
+        return cached
+    
     try:
         payload = jwt.decode(
             token,
-            settings.jwt_secret_key,
-            algorithms=[settings.jwt_algorithm]
+            _JWT_SECRET_KEY,
+            algorithms=_JWT_ALGORITHMS,
+            options=_JWT_DECODE_OPTIONS
         )
         
         # Verify token type
@@ -99,9 +183,10 @@ def verify_access_token(token: str) -> Optional[Dict[str, Any]]:
             logger.warning("Invalid token type")
             return None
         
+        _access_token_cache.put(token, payload)
         return payload
         
-    except JWTError as e:
+    except jwt.PyJWTError as e:
         logger.warning(f"JWT verification failed: {str(e)}")
         return None
 
@@ -116,11 +201,16 @@ def verify_refresh_token(token: str) -> Optional[Dict[str, Any]]:
     Returns:
         Decoded token payload if valid, None otherwise
     """
+    cached = _refresh_token_cache.get(token)
+    if cached is not None:
+        return cached
+    
     try:
         payload = jwt.decode(
             token,
-            settings.jwt_secret_key,
-            algorithms=[settings.jwt_algorithm]
+            _JWT_SECRET_KEY,
+            algorithms=_JWT_ALGORITHMS,
+            options=_JWT_DECODE_OPTIONS
         )
         
         # Verify token type
@@ -128,9 +218,10 @@ def verify_refresh_token(token: str) -> Optional[Dict[str, Any]]:
             logger.warning("Invalid token type")
             return None
         
+        _refresh_token_cache.put(token, payload)
         return payload
         
-    except JWTError as e:
+    except jwt.PyJWTError as e:
         logger.warning(f"JWT refresh verification failed: {str(e)}")
         return None
 
@@ -168,3 +259,27 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     except Exception as e:
         logger.error(f"Password verification error: {e}")
         return False
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password on the bcrypt thread pool
+    
+    Use from async handlers instead of hash_password, which blocks
+    the event loop for the duration of the hash.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password on the bcrypt thread pool
+    
+    Use from async handlers instead of verify_password, which blocks
+    the event loop for the duration of the check.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _password_executor, verify_password, plain_password, hashed_password
+    )
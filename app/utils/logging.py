@@ -8,8 +8,32 @@ import logging
 import time
 import functools
 from typing import Any, Dict, Optional, Callable
-from datetime import datetime, UTC
-import json
+import orjson
+
+# (epoch second, "YYYY-MM-DDTHH:MM:SS") of the last formatted timestamp.
+# Stored as one tuple so concurrent readers never see a torn update.
+_ts_cache = (0, "")
+
+
+def _utc_timestamp() -> str:
+    """Current UTC time as ISO-8601 with microseconds and a Z suffix"""
+    global _ts_cache
+    now = time.time()
+    sec = int(now)
+    cached_sec, prefix = _ts_cache
+    if sec != cached_sec:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+        _ts_cache = (sec, prefix)
+    return f"{prefix}.{int((now - sec) * 1_000_000):06d}Z"
+
+
+def _dumps(log_data: Dict[str, Any]) -> str:
+    """Serialize a log record to a JSON string (UTF-8)"""
+    return orjson.dumps(
+        log_data,
+        default=str,
+        option=orjson.OPT_NON_STR_KEYS
+    ).decode()
 
 
 class StructuredLogger:
@@ -34,39 +58,49 @@ class StructuredLogger:
     def _format_message(self, level: str, message: str, **extra) -> Dict[str, Any]:
         """Format log message as structured JSON"""
         log_data = {
-            "timestamp": datetime.now(UTC).isoformat(),
+            "timestamp": _utc_timestamp(),
             "level": level,
             "message": message,
-            "logger": self.logger.name,
-            **self.context,
-            **extra
+            "logger": self.logger.name
         }
+        log_data.update(self.context)
+        log_data.update(extra)
         return log_data
     
     def debug(self, message: str, **extra):
         """Log debug message"""
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
         log_data = self._format_message("DEBUG", message, **extra)
-        self.logger.debug(json.dumps(log_data, ensure_ascii=False))
+        self.logger.debug(_dumps(log_data))
     
     def info(self, message: str, **extra):
         """Log info message"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         log_data = self._format_message("INFO", message, **extra)
-        self.logger.info(json.dumps(log_data, ensure_ascii=False))
+        self.logger.info(_dumps(log_data))
     
     def warning(self, message: str, **extra):
         """Log warning message"""
+        if not self.logger.isEnabledFor(logging.WARNING):
+            return
         log_data = self._format_message("WARNING", message, **extra)
-        self.logger.warning(json.dumps(log_data, ensure_ascii=False))
+        self.logger.warning(_dumps(log_data))
     
     def error(self, message: str, **extra):
         """Log error message"""
+        if not self.logger.isEnabledFor(logging.ERROR):
+            return
         log_data = self._format_message("ERROR", message, **extra)
-        self.logger.error(json.dumps(log_data, ensure_ascii=False))
+        self.logger.error(_dumps(log_data))
     
     def critical(self, message: str, **extra):
         """Log critical message"""
+        if not self.logger.isEnabledFor(logging.CRITICAL):
+            return
         log_data = self._format_message("CRITICAL", message, **extra)
-        self.logger.critical(json.dumps(log_data, ensure_ascii=False))
+        self.logger.critical(_dumps(log_data))
 
 
 def log_execution_time(logger: Optional[StructuredLogger] = None):
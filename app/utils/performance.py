@@ -3,13 +3,13 @@ Performance Monitoring Utilities
 
 Track and report application performance metrics.
 """
+import math
 import time
-import asyncio
-from typing import Dict, List, Optional
+import threading
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, UTC
-from collections import defaultdict
-import statistics
+import numpy as np
 
 from app.utils.logging import get_logger
 
@@ -25,6 +25,195 @@ class PerformanceMetric:
     tags: Dict[str, str] = field(default_factory=dict)
 
 
+class MetricStore:
+    """
+    Fixed-capacity ring buffer holding metrics column-wise
+    
+    Each field lives in its own NumPy array (structure of arrays) instead
+    of one PerformanceMetric object per measurement. Names are interned to
+    integer codes, and timestamps are monotonic nanoseconds in append order
+    (callers must not append a stamp older than the newest one), so time
+    filtering is a binary search and name filtering is a vector compare.
+    Once full, the oldest entries are overwritten.
+    """
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.name_codes = np.empty(capacity, dtype=np.int32)
+        self.durations = np.empty(capacity, dtype=np.float64)
+        self.timestamps = np.empty(capacity, dtype=np.int64)
+        self.tags = np.empty(capacity, dtype=object)
+        self.names: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self._start = 0  # Slot of the oldest entry
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def append(
+        self,
+        name: str,
+        duration_ms: float,
+        timestamp_ns: int,
+        tags: Dict[str, str]
+    ) -> Optional[Tuple[str, float]]:
+        """
+        Append one metric, evicting the oldest if full
+        
+        Returns:
+            (name, duration_ms) of the evicted metric, or None
+        """
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self.names)
+            self.names.append(name)
+        
+        slot = (self._start + self._size) % self.capacity
+        evicted = None
+        if self._size == self.capacity:
+            evicted = (self.names[self.name_codes[slot]], float(self.durations[slot]))
+        
+        self.name_codes[slot] = code
+        self.durations[slot] = duration_ms
+        self.timestamps[slot] = timestamp_ns
+        self.tags[slot] = tags
+        
+        if self._size < self.capacity:
+            self._size += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+        return evicted
+    
+    def ordered(self, column: np.ndarray) -> np.ndarray:
+        """Return a column's live entries, oldest first"""
+        end = self._start + self._size
+        if end <= self.capacity:
+            return column[self._start:end]
+        return np.concatenate((column[self._start:], column[:end - self.capacity]))
+    
+    def window(self, since_ns: Optional[int] = None) -> slice:
+        """Slice of the ordered columns covering entries at or after since_ns"""
+        if since_ns is None:
+            return slice(0, self._size)
+        start = int(np.searchsorted(self.ordered(self.timestamps), since_ns, side="left"))
+        return slice(start, self._size)
+    
+    def code_of(self, name: str) -> Optional[int]:
+        """Integer code for a metric name, if it has been seen"""
+        return self._codes.get(name)
+    
+    def drop_before(self, cutoff_ns: int) -> int:
+        """Drop entries older than cutoff_ns, returning how many were removed"""
+        removed = self.window(cutoff_ns).start
+        if removed:
+            # Release tag dicts held by the dropped slots
+            for i in range(removed):
+                self.tags[(self._start + i) % self.capacity] = None
+            self._start = (self._start + removed) % self.capacity
+            self._size -= removed
+        return removed
+
+
+class RunningStats:
+    """
+    Streaming per-name duration statistics
+    
+    Keeps count, sum, min and max exactly, plus a log-bucketed histogram
+    (2% relative width) from which median/p95/p99 are estimated. Adding and
+    removing are O(1) and taking a snapshot does not touch the raw metric
+    history, except that removing the current min or max marks the extremes
+    stale until the owner recomputes them (``extremes_stale``).
+    """
+    
+    BASE_MS = 0.01       # Upper edge of the first bucket
+    GROWTH = 1.02        # Relative width of each bucket
+    NUM_BUCKETS = 1100   # Covers up to ~50 minutes
+    _LOG_GROWTH = math.log(GROWTH)
+    
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.histogram = np.zeros(self.NUM_BUCKETS, dtype=np.int64)
+        self.extremes_stale = False
+    
+    @classmethod
+    def _bucket(cls, duration_ms: float) -> int:
+        if duration_ms < cls.BASE_MS:
+            return 0
+        index = int(math.log(duration_ms / cls.BASE_MS) / cls._LOG_GROWTH) + 1
+        return min(index, cls.NUM_BUCKETS - 1)
+    
+    def add(self, duration_ms: float):
+        """Fold one duration into the running statistics"""
+        self.count += 1
+        self.total += duration_ms
+        if duration_ms < self.min:
+            self.min = duration_ms
+        if duration_ms > self.max:
+            self.max = duration_ms
+        self.histogram[self._bucket(duration_ms)] += 1
+    
+    def remove(self, duration_ms: float):
+        """Take back one duration previously added"""
+        self.count -= 1
+        self.total -= duration_ms
+        self.histogram[self._bucket(duration_ms)] -= 1
+        if duration_ms <= self.min or duration_ms >= self.max:
+            self.extremes_stale = True
+    
+    @classmethod
+    def from_array(cls, durations: np.ndarray) -> "RunningStats":
+        """Build running statistics from a batch of durations"""
+        stats = cls()
+        if durations.size:
+            with np.errstate(divide="ignore"):
+                buckets = np.floor(np.log(durations / cls.BASE_MS) / cls._LOG_GROWTH) + 1
+            buckets = np.clip(np.nan_to_num(buckets, neginf=0), 0, cls.NUM_BUCKETS - 1)
+            stats.count = int(durations.size)
+            stats.total = float(durations.sum())
+            stats.min = float(durations.min())
+            stats.max = float(durations.max())
+            stats.histogram = np.bincount(
+                buckets.astype(np.int64), minlength=cls.NUM_BUCKETS
+            )
+        return stats
+    
+    def _estimate(self, cumulative: np.ndarray, rank: int) -> float:
+        """Estimate the value at a 0-based rank from the histogram"""
+        index = int(np.searchsorted(cumulative, rank, side="right"))
+        if index == 0:
+            value = self.BASE_MS / 2
+        else:
+            # Geometric midpoint of the bucket
+            value = self.BASE_MS * self.GROWTH ** (index - 0.5)
+        return min(max(value, self.min), self.max)
+    
+    def snapshot(self) -> Dict[str, float]:
+        """Current statistics, in the same shape as _summarize"""
+        n = self.count
+        cumulative = np.cumsum(self.histogram)
+        return {
+            "count": n,
+            "min_ms": self.min,
+            "max_ms": self.max,
+            "mean_ms": self.total / n,
+            "median_ms": (
+                self._estimate(cumulative, (n - 1) // 2)
+                + self._estimate(cumulative, n // 2)
+            ) / 2,
+            "p95_ms": self._estimate(cumulative, min(int(0.95 * n), n - 1)),
+            "p99_ms": self._estimate(cumulative, min(int(0.99 * n), n - 1)),
+        }
+
+
+def _to_ns(dt: datetime) -> int:
+    """Convert a datetime to epoch nanoseconds"""
+    return int(dt.timestamp() * 1_000_000_000)
+
+
 class PerformanceMonitor:
     """
     Monitor and track performance metrics
@@ -36,10 +225,44 @@ class PerformanceMonitor:
     - Alert on slow requests
     """
     
-    def __init__(self, alert_threshold_ms: float = 1000):
-        self.metrics: List[PerformanceMetric] = []
+    def __init__(self, alert_threshold_ms: float = 1000, max_metrics: int = 100_000):
+        # Bounded: the oldest metrics are evicted once max_metrics is reached
+        self._store = MetricStore(max_metrics)
+        # Running per-name aggregates over the retained metrics
+        self._running: Dict[str, RunningStats] = {}
         self.alert_threshold_ms = alert_threshold_ms
-        self._lock = asyncio.Lock()
+        # Plain lock so threads can record too; it is never held across an await
+        self._lock = threading.Lock()
+        # Metrics are stamped with the monotonic clock so the store stays
+        # sorted even if the wall clock steps back; this maps them to epoch time
+        self._wall_offset_ns = time.time_ns() - time.monotonic_ns()
+    
+    def _to_store_ns(self, dt: datetime) -> int:
+        """Convert a wall-clock datetime to the store's monotonic timeline"""
+        return _to_ns(dt) - self._wall_offset_ns
+    
+    @property
+    def metrics(self) -> List[PerformanceMetric]:
+        """Snapshot of retained metrics as PerformanceMetric objects, oldest first"""
+        store = self._store
+        with self._lock:
+            rows = list(zip(
+                store.ordered(store.name_codes),
+                store.ordered(store.durations),
+                store.ordered(store.timestamps),
+                store.ordered(store.tags)
+            ))
+        return [
+            PerformanceMetric(
+                name=store.names[code],
+                duration_ms=float(duration),
+                timestamp=datetime.fromtimestamp(
+                    (int(ts) + self._wall_offset_ns) / 1_000_000_000, UTC
+                ),
+                tags=tags
+            )
+            for code, duration, ts, tags in rows
+        ]
     
     async def record(
         self,
@@ -48,24 +271,52 @@ class PerformanceMonitor:
         tags: Optional[Dict[str, str]] = None
     ):
         """Record a performance metric"""
-        metric = PerformanceMetric(
-            name=name,
-            duration_ms=duration_ms,
-            timestamp=datetime.now(UTC),
-            tags=tags or {}
-        )
+        self._record_impl(name, duration_ms, tags)
+    
+    def record_sync(
+        self,
+        name: str,
+        duration_ms: float,
+        tags: Optional[Dict[str, str]] = None
+    ):
+        """
+        Record a performance metric from synchronous code
         
-        async with self._lock:
-            self.metrics.append(metric)
+        Safe to call from worker threads; no event loop is required.
+        """
+        self._record_impl(name, duration_ms, tags)
+    
+    def _record_impl(
+        self,
+        name: str,
+        duration_ms: float,
+        tags: Optional[Dict[str, str]]
+    ):
+        """Append a metric and update running aggregates"""
+        with self._lock:
+            evicted = self._store.append(name, duration_ms, time.monotonic_ns(), tags or {})
             
-            # Alert if slow
-            if duration_ms > self.alert_threshold_ms:
-                logger.warning(
-                    f"Slow operation detected: {name}",
-                    duration_ms=duration_ms,
-                    threshold_ms=self.alert_threshold_ms,
-                    **tags or {}
-                )
+            # Keep running aggregates in step with the ring buffer
+            if evicted is not None:
+                evicted_name, evicted_duration = evicted
+                evicted_running = self._running[evicted_name]
+                evicted_running.remove(evicted_duration)
+                if evicted_running.count == 0:
+                    del self._running[evicted_name]
+            
+            running = self._running.get(name)
+            if running is None:
+                running = self._running[name] = RunningStats()
+            running.add(duration_ms)
+        
+        # Alert if slow
+        if duration_ms > self.alert_threshold_ms:
+            logger.warning(
+                f"Slow operation detected: {name}",
+                duration_ms=duration_ms,
+                threshold_ms=self.alert_threshold_ms,
+                **tags or {}
+            )
     
     async def get_stats(
         self,
@@ -82,63 +333,72 @@ class PerformanceMonitor:
         Returns:
             Statistics dictionary
         """
-        async with self._lock:
+        with self._lock:
+            store = self._store
+            
             # Filter metrics
-            filtered = self.metrics
+            window = store.window(self._to_store_ns(since) if since else None)
+            durations = store.ordered(store.durations)[window]
             
             if name:
-                filtered = [m for m in filtered if m.name == name]
+                code = store.code_of(name)
+                if code is None:
+                    durations = durations[:0]
+                else:
+                    durations = durations[store.ordered(store.name_codes)[window] == code]
             
-            if since:
-                filtered = [m for m in filtered if m.timestamp >= since]
-            
-            if not filtered:
+            if durations.size == 0:
                 return {
                     "count": 0,
                     "name": name
                 }
             
-            # Calculate stats
-            durations = [m.duration_ms for m in filtered]
-            
             return {
-                "count": len(filtered),
+                "count": int(durations.size),
                 "name": name,
-                "min_ms": min(durations),
-                "max_ms": max(durations),
-                "mean_ms": statistics.mean(durations),
-                "median_ms": statistics.median(durations),
-                "p95_ms": self._percentile(durations, 95),
-                "p99_ms": self._percentile(durations, 99),
+                **self._summarize(durations)
             }
     
     async def get_aggregated_stats(
         self,
         since: Optional[datetime] = None
     ) -> Dict[str, Dict]:
-        """Get stats aggregated by metric name"""
-        async with self._lock:
+        """
+        Get stats aggregated by metric name
+        
+        Without ``since``, stats come from running per-name aggregates
+        (O(number of names)) over the same retained metrics get_stats()
+        sees; median/p95/p99 are histogram estimates within ~2%. With
+        ``since``, stats are computed exactly from the retained metrics.
+        """
+        if since is None:
+            with self._lock:
+                self._refresh_stale_extremes()
+                return {
+                    name: running.snapshot()
+                    for name, running in self._running.items()
+                }
+        
+        with self._lock:
+            store = self._store
+            
             # Filter by time
-            filtered = self.metrics
-            if since:
-                filtered = [m for m in filtered if m.timestamp >= since]
+            window = store.window(self._to_store_ns(since))
+            codes = store.ordered(store.name_codes)[window]
+            durations = store.ordered(store.durations)[window]
             
-            # Group by name
-            by_name = defaultdict(list)
-            for metric in filtered:
-                by_name[metric.name].append(metric.duration_ms)
+            # Group by name: sort by code, then split into contiguous runs
+            order = np.argsort(codes, kind="stable")
+            codes = codes[order]
+            durations = durations[order]
+            unique_codes, starts = np.unique(codes, return_index=True)
             
             # Calculate stats for each
             stats = {}
-            for name, durations in by_name.items():
-                stats[name] = {
-                    "count": len(durations),
-                    "min_ms": min(durations),
-                    "max_ms": max(durations),
-                    "mean_ms": statistics.mean(durations),
-                    "median_ms": statistics.median(durations),
-                    "p95_ms": self._percentile(durations, 95),
-                    "p99_ms": self._percentile(durations, 99),
+            for code, group in zip(unique_codes, np.split(durations, starts[1:])):
+                stats[store.names[code]] = {
+                    "count": int(group.size),
+                    **self._summarize(group)
                 }
             
             return stats
@@ -147,28 +407,70 @@ class PerformanceMonitor:
         """Remove old metrics to prevent memory issues"""
         cutoff = datetime.now(UTC) - timedelta(hours=older_than_hours)
         
-        async with self._lock:
-            before_count = len(self.metrics)
-            self.metrics = [m for m in self.metrics if m.timestamp >= cutoff]
-            after_count = len(self.metrics)
+        with self._lock:
+            # Metrics are stored in time order, so expired ones are a prefix
+            removed = self._store.drop_before(self._to_store_ns(cutoff))
             
-            if before_count > after_count:
+            if removed:
+                self._rebuild_running()
+                
                 logger.info(
-                    f"Cleaned up {before_count - after_count} old metrics",
-                    retained=after_count
+                    f"Cleaned up {removed} old metrics",
+                    retained=len(self._store)
                 )
     
+    def _refresh_stale_extremes(self):
+        """Recompute min/max for names whose extreme value was evicted"""
+        stale = [
+            (name, running)
+            for name, running in self._running.items()
+            if running.extremes_stale
+        ]
+        if not stale:
+            return
+        
+        store = self._store
+        codes = store.ordered(store.name_codes)
+        durations = store.ordered(store.durations)
+        for name, running in stale:
+            group = durations[codes == store.code_of(name)]
+            running.min = float(group.min())
+            running.max = float(group.max())
+            running.extremes_stale = False
+    
+    def _rebuild_running(self):
+        """Recompute running aggregates from the retained metrics"""
+        store = self._store
+        codes = store.ordered(store.name_codes)
+        durations = store.ordered(store.durations)
+        self._running = {
+            store.names[code]: RunningStats.from_array(durations[codes == code])
+            for code in np.unique(codes)
+        }
+    
     @staticmethod
-    def _percentile(data: List[float], percentile: float) -> float:
-        """Calculate percentile"""
-        if not data:
-            return 0.0
+    def _summarize(durations: np.ndarray) -> Dict[str, float]:
+        """
+        Calculate min/max/mean/median/p95/p99 of a non-empty array
         
-        sorted_data = sorted(data)
-        index = int((percentile / 100.0) * len(sorted_data))
-        index = min(index, len(sorted_data) - 1)
+        All order statistics come from a single np.partition call (O(n))
+        instead of sorting. Percentiles use the nearest-rank index
+        int(p * n), and the median averages the two middle values.
+        """
+        n = durations.size
+        lo, hi = (n - 1) // 2, n // 2
+        i95 = min(int(0.95 * n), n - 1)
+        i99 = min(int(0.99 * n), n - 1)
+        part = np.partition(durations, sorted({0, lo, hi, i95, i99, n - 1}))
         
-        return sorted_data[index]
+        return {
+            "min_ms": float(part[0]),
+            "max_ms": float(part[n - 1]),
+            "mean_ms": float(durations.mean()),
+            "median_ms": float((part[lo] + part[hi]) / 2),
+            "p95_ms": float(part[i95]),
+            "p99_ms": float(part[i99]),
+        }
 
 
 # Global performance monitor
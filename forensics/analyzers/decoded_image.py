@@ -0,0 +1,60 @@
+"""
+Decoded Image
+
+Decode an upload once and share the grayscale arrays between the
+pixel-level analyzers instead of each re-decoding the same bytes.
+"""
+import numpy as np
+from PIL import Image
+import io
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class DecodedImage:
+    """Pre-decoded views of an image shared by the analyzers"""
+
+    image_bytes: bytes
+    format: Optional[str]
+
+    # Grayscale resized to 512x512 (frequency domain analysis)
+    gray_512: np.ndarray
+
+    # Grayscale thumbnailed to fit 1024x1024 (noise residual analysis)
+    gray_1024: np.ndarray
+
+    @classmethod
+    def from_bytes(cls, image_bytes: bytes) -> "DecodedImage":
+        """
+        Decode image bytes once
+
+        Raises:
+            Exception: whatever PIL raises for unreadable images
+        """
+        image = Image.open(io.BytesIO(image_bytes))
+        image_format = image.format
+        gray = image.convert('L')
+
+        gray_512 = gray
+        if gray.width != 512 or gray.height != 512:
+            gray_512 = gray.resize((512, 512), Image.Resampling.LANCZOS)
+
+        gray_1024 = gray
+        if gray.width > 1024 or gray.height > 1024:
+            gray_1024 = gray.copy()
+            gray_1024.thumbnail((1024, 1024))
+
+        return cls(
+            image_bytes=image_bytes,
+            format=image_format,
+            gray_512=cls._readonly(gray_512),
+            gray_1024=cls._readonly(gray_1024),
+        )
+
+    @staticmethod
+    def _readonly(image: Image.Image) -> np.ndarray:
+        """float32 array that analyzers cannot modify in place"""
+        array = np.asarray(image, dtype=np.float32)
+        array.setflags(write=False)
+        return array
@@ -2,7 +2,7 @@ import cv2
 import numpy as np
 import io
 import base64
-from PIL import Image, ImageChops, ImageEnhance
+from PIL import Image
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,43 +17,41 @@ class ELAAnalyzer:
     
     def analyze(self, image_bytes: bytes) -> dict:
         try:
-            # Load original image
-            original = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+            # Load original image once, straight into a BGR array
+            original_bgr = self._decode_bgr(image_bytes)
             
-            # 1. Save at 90% quality to a buffer
-            buffer = io.BytesIO()
-            original.save(buffer, "JPEG", quality=90)
-            buffer.seek(0)
+            # 1. Save at 90% quality to an in-memory buffer
+            success, buffer = cv2.imencode(".jpg", original_bgr, [cv2.IMWRITE_JPEG_QUALITY, 90])
+            if not success:
+                raise ValueError("Failed to re-encode image as JPEG")
             
-            # 2. Open the resaved image
-            resaved = Image.open(buffer)
+            # 2. Decode the resaved image from the encoder output
+            resaved = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
             
             # 3. Calculate difference (Error Level)
-            ela_image = ImageChops.difference(original, resaved)
+            ela_image = cv2.absdiff(original_bgr, resaved)
             
             # 4. Enhance the difference to make it visible
             # Find maximum difference to scale appropriately
-            extrema = ela_image.getextrema()
-            max_diff = max([ex[1] for ex in extrema])
+            _, max_diff, _, _ = cv2.minMaxLoc(ela_image.reshape(-1))
+            max_diff = int(max_diff)
             
             if max_diff == 0:
                 max_diff = 1 # Avoid division by zero
                 
             scale = 255.0 / max_diff
             
-            # Enhance: brightness * scale
-            ela_enhanced = ImageEnhance.Brightness(ela_image).enhance(scale * 10) # Multiply scale to make it clearly visible
+            # Enhance: brightness * scale, saturated to uint8 in the same pass
+            ela_enhanced = cv2.convertScaleAbs(ela_image, alpha=scale * 10) # Multiply scale to make it clearly visible
             
             # 5. Convert to Base64 for frontend display
-            output_buffer = io.BytesIO()
-            ela_enhanced.save(output_buffer, format="JPEG")
-            ela_base64 = base64.b64encode(output_buffer.getvalue()).decode('utf-8')
+            _, output_buffer = cv2.imencode(".jpg", ela_enhanced, [cv2.IMWRITE_JPEG_QUALITY, 75])
+            ela_base64 = base64.b64encode(output_buffer.tobytes()).decode('utf-8')
             
             # 6. Calculate an "ELA Score" based on variance of the difference
             # High variance in specific regions = potential edit
-            ela_np = np.array(ela_image)
-            dmean = np.mean(ela_np)
-            dstd = np.std(ela_np)
+            channel_means, _ = cv2.meanStdDev(ela_image)
+            dmean = float(channel_means.mean())
             
             # Simple heuristic score: if there's significant noise
             score = min(1.0, dmean / 10.0)
@@ -71,3 +69,13 @@ class ELAAnalyzer:
                 "ela_score": 0.0,
                 "error": str(e)
             }
+    
+    @staticmethod
+    def _decode_bgr(image_bytes: bytes) -> np.ndarray:
+        """Decode image bytes to a 3-channel BGR array, falling back to PIL for formats OpenCV can't read"""
+        img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+        if img is not None:
+            return img
+        
+        original = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+        return cv2.cvtColor(np.asarray(original), cv2.COLOR_RGB2BGR)
@@ -5,18 +5,44 @@ Analyze image in frequency domain to detect periodic patterns (GAN artifacts),
 high-frequency energy anomalies, and deepfake artifacts.
 """
 import numpy as np
-from scipy import fftpack
-from PIL import Image
-import io
+from scipy import fft as sp_fft
+from scipy.ndimage import maximum_filter
+from numpy.lib.stride_tricks import sliding_window_view
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 
+from analyzers.decoded_image import DecodedImage
+
+
+@lru_cache(maxsize=8)
+def _radial_masks(h: int, w: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Masks around the spectrum center, built once per shape
+    
+    Returns (low-frequency disk of radius h//4, DC disk of radius 20).
+    Both are read-only since they are shared between calls.
+    """
+    cy, cx = h//2, w//2
+    y, x = np.ogrid[:h, :w]
+    dist_sq = (x - cx)**2 + (y - cy)**2
+    low_freq_mask = dist_sq <= (h//4)**2
+    center_mask = dist_sq <= 20**2 # 20px radius
+    low_freq_mask.setflags(write=False)
+    center_mask.setflags(write=False)
+    return low_freq_mask, center_mask
+
+
 class FrequencyDomainAnalyzer:
     """Analyze images in frequency domain using FFT"""
     
-    def analyze(self, image_bytes: bytes) -> Dict:
+    def analyze(self, image_bytes: bytes, decoded: Optional[DecodedImage] = None) -> Dict:
         """
         Analyze frequency spectrum
         
+        Args:
+            image_bytes: Raw image bytes
+            decoded: Shared pre-decoded image; decoded here when omitted
+        
         Returns:
             dict with features and suspicious indicators
         """
@@ -25,25 +51,21 @@ class FrequencyDomainAnalyzer:
         score = 0.0
         
         try:
-            # Load and convert to grayscale
-            image = Image.open(io.BytesIO(image_bytes)).convert('L')
-            
-            # Resize for consistent analysis (std 512x512)
+            # Grayscale resized for consistent analysis (std 512x512)
             # Powers of 2 are faster for FFT
-            if image.width != 512 or image.height != 512:
-                image = image.resize((512, 512), Image.Resampling.LANCZOS)
-                
-            img_array = np.array(image, dtype=float)
+            if decoded is None:
+                decoded = DecodedImage.from_bytes(image_bytes)
+            img_array = decoded.gray_512
             
-            # 1. Compute 2D FFT
-            f = fftpack.fft2(img_array)
-            fshift = fftpack.fftshift(f)
-            magnitude_spectrum = 20 * np.log(np.abs(fshift) + 1e-6)
+            # 1. Compute 2D FFT (centered log-magnitude spectrum)
+            magnitude_spectrum = self._log_magnitude_spectrum(img_array)
+            
+            low_freq_mask, center_mask = _radial_masks(*magnitude_spectrum.shape)
             
             # 2. Analyze Azimuthal Average (Radial Profile)
             # AI images often have different spectral decay rates
             # (drop off faster in high frequencies)
-            features["high_freq_energy"] = self._calculate_high_freq_energy(magnitude_spectrum)
+            features["high_freq_energy"] = self._calculate_high_freq_energy(magnitude_spectrum, low_freq_mask)
             
             # Check for AI artifact: Low high-frequency energy (Too smooth/blur at fine scales)
             # Threshold needs tuning, but < 0.15 is often suspicious for sharp-looking images
@@ -55,7 +77,7 @@ class FrequencyDomainAnalyzer:
             # 3. Detect Periodic Spikes (Grid Artifacts)
             # GANs and some Diffusion models leave grid-like artifacts in frequency domain
             # We look for bright spots in the spectrum (excluding center)
-            has_spikes = self._detect_periodic_spikes(magnitude_spectrum)
+            has_spikes = self._detect_periodic_spikes(magnitude_spectrum, center_mask)
             features["has_periodic_spikes"] = has_spikes
             
             if has_spikes:
@@ -81,18 +103,35 @@ class FrequencyDomainAnalyzer:
             "score": min(score, 1.0)
         }
     
-    def _calculate_high_freq_energy(self, magnitude_spectrum: np.ndarray) -> float:
-        """Calculate ratio of energy in high frequencies vs total"""
-        h, w = magnitude_spectrum.shape
-        cy, cx = h//2, w//2
+    @staticmethod
+    def _log_magnitude_spectrum(img_array: np.ndarray) -> np.ndarray:
+        """
+        Centered 20*log(|FFT|) spectrum of a real image
+        
+        Uses the half-spectrum real FFT and fills in the other half from
+        Hermitian symmetry (|F(-u,-v)| == |F(u,v)|), so the FFT and the log
+        run over half the coefficients. scipy.fft caches its plans/twiddle
+        factors per shape and spreads the row/column passes over all cores.
+        """
+        h, w = img_array.shape
+        half = 20 * np.log(np.abs(sp_fft.rfft2(img_array, workers=-1)) + 1e-6)
+        n_half = half.shape[1]
         
+        full = np.empty((h, w), dtype=half.dtype)
+        full[:, :n_half] = half
+        mirror_rows = (-np.arange(h)) % h
+        mirror_cols = w - np.arange(n_half, w)
+        full[:, n_half:] = half[mirror_rows][:, mirror_cols]
+        
+        return sp_fft.fftshift(full)
+    
+    def _calculate_high_freq_energy(self, magnitude_spectrum: np.ndarray, low_freq_mask: np.ndarray) -> float:
+        """Calculate ratio of energy in high frequencies vs total"""
         # Total energy (sum of magnitude)
         total_energy = np.sum(magnitude_spectrum)
         
         # Low frequency energy (center circle)
-        y, x = np.ogrid[:h, :w]
-        mask_area = (x - cx)**2 + (y - cy)**2 <= (h//4)**2
-        low_freq_energy = np.sum(magnitude_spectrum[mask_area])
+        low_freq_energy = np.sum(magnitude_spectrum[low_freq_mask])
         
         # High freq is roughly Total - Low
         high_freq_energy = total_energy - low_freq_energy
@@ -100,27 +139,35 @@ class FrequencyDomainAnalyzer:
         if total_energy == 0: return 0.0
         return float(high_freq_energy / total_energy)
 
-    def _detect_periodic_spikes(self, magnitude_spectrum: np.ndarray) -> bool:
+    def _detect_periodic_spikes(self, magnitude_spectrum: np.ndarray, center_mask: np.ndarray) -> bool:
         """Detect bright spikes in spectrum (excluding DC center)"""
-        h, w = magnitude_spectrum.shape
-        cy, cx = h//2, w//2
-        
         # Mask out the DC component (center star)
         # Natural images have high energy at center
-        y, x = np.ogrid[:h, :w]
-        center_mask = (x - cx)**2 + (y - cy)**2 <= 20**2 # 20px radius
-        
         spectrum_no_dc = magnitude_spectrum.copy()
         spectrum_no_dc[center_mask] = 0
         
-        # Calculate threshold for "spike"
-        # Spikes are significantly brighter than local neighborhood
-        mean = np.mean(spectrum_no_dc)
-        std = np.std(spectrum_no_dc)
-        threshold = mean + 5 * std  # Very bright spots
+        # Calculate threshold for "spike" from the region outside the DC disk
+        outside_dc = magnitude_spectrum[~center_mask]
+        threshold = outside_dc.mean() + 5 * outside_dc.std()  # Very bright spots
+        
+        # Spikes are significantly brighter than the rest of the spectrum,
+        # the maximum of their local 7x7 neighborhood, and outside the DC disk.
+        # Only pixels over the threshold can be spikes, so the decision is
+        # settled without the neighborhood test when there are too few of them
+        candidates = (spectrum_no_dc > threshold) & ~center_mask
+        ys, xs = np.nonzero(candidates)
+        if ys.size <= 10:
+            return False
         
-        # Count spikes
-        spikes = np.sum(spectrum_no_dc > threshold)
+        if ys.size * 49 < spectrum_no_dc.size:
+            # Few candidates: compare each against its own 7x7 window
+            # (-inf padding matches maximum_filter's reflect mode here)
+            padded = np.pad(spectrum_no_dc, 3, constant_values=-np.inf)
+            windows = sliding_window_view(padded, (7, 7))
+            local_max = windows[ys, xs].max(axis=(1, 2))
+        else:
+            local_max = maximum_filter(spectrum_no_dc, size=7)[ys, xs]
+        spikes = np.count_nonzero(spectrum_no_dc[ys, xs] == local_max)
         
         # If too many spikes (starry sky), likely GAN grid artifacts
         # Natural images are usually smooth clouds in freq domain
@@ -5,8 +5,7 @@ Analyzes JPEG compression artifacts to detect manipulation,
 double compression, and non-standard quantization tables.
 """
 import numpy as np
-from PIL import Image
-import io
+import hashlib
 import struct
 from typing import Dict, List, Optional, Tuple
 import math
@@ -21,6 +20,9 @@ class JpegForensicsAnalyzer:
         "photoshop_60", "photoshop_80", "photoshop_100" 
     ]
     
+    # SOI marker followed by the first segment marker
+    JPEG_MAGIC = b"\xff\xd8\xff"
+    
     def analyze(self, image_bytes: bytes) -> Dict:
         """
         Analyze JPEG structure and artifacts
@@ -33,22 +35,14 @@ class JpegForensicsAnalyzer:
         scores = {}
         
         # 1. Basic JPEG Structure Check
-        try:
-            image = Image.open(io.BytesIO(image_bytes))
-            if image.format != "JPEG":
-                return {
-                    "is_jpeg": False,
-                    "features": {"is_jpeg": False},
-                    "warnings": [],
-                    "score": 0.0
-                }
-        except:
-             return {
-                 "is_jpeg": False, 
-                 "features": {"is_jpeg": False},
-                 "warnings": ["invalid_image"], 
-                 "score": 0.0
-             }
+        # Signature only - PNG/WebP screenshots bail out before any parsing
+        if not image_bytes.startswith(self.JPEG_MAGIC):
+            return {
+                "is_jpeg": False,
+                "features": {"is_jpeg": False},
+                "warnings": [],
+                "score": 0.0
+            }
 
         features["is_jpeg"] = True
         
@@ -87,40 +81,41 @@ class JpegForensicsAnalyzer:
             "score": max(scores.values()) if scores else 0.0
         }
 
-    def _extract_quantization_tables(self, data: bytes) -> List[List[int]]:
-        """Extract DQT segments from JPEG binary"""
+    def _extract_quantization_tables(self, data: bytes) -> List[np.ndarray]:
+        """Extract DQT segments from JPEG binary (tables are zero-copy uint8 views)"""
         q_tables = []
-        i = 0
-        while i < len(data) - 1:
+        view = memoryview(data)
+        i = data.find(b"\xff")
+        while 0 <= i < len(data) - 1:
             if data[i] == 0xFF:
                 marker = data[i+1]
                 if marker == 0xD8: # SOI
                     i += 2
                 elif marker == 0xD9: # EOI
                     break
+                elif i + 3 >= len(data):
+                    # Truncated segment header
+                    break
                 elif marker == 0xDB: # DQT
-                    length = data[i+2] * 256 + data[i+3]
-                    # DQT payload starts at i+4
                     # Length includes the 2 bytes for length
-                    payload = data[i+4 : i+2+length]
+                    (length,) = struct.unpack_from(">H", data, i + 2)
+                    # DQT payload starts at i+4
+                    start = i + 4
+                    end = min(i + 2 + length, len(data))
                     
                     # Parse tables in this segment
-                    pos = 0
-                    while pos < len(payload):
+                    pos = start
+                    while pos < end:
                         # Precision (4 bits) and ID (4 bits)
-                        info = payload[pos]
+                        info = data[pos]
                         precision = info >> 4
-                        t_id = info & 0x0F
                         pos += 1
                         
                         # 8-bit precision = 64 bytes, 16-bit = 128 bytes
-                        if precision == 0:
-                            table_size = 64
-                        else:
-                            table_size = 128
+                        table_size = 64 if precision == 0 else 128
                             
-                        if pos + table_size <= len(payload):
-                            table = list(payload[pos : pos + table_size])
+                        if pos + table_size <= end:
+                            table = np.frombuffer(view, dtype=np.uint8, count=table_size, offset=pos)
                             q_tables.append(table)
                             pos += table_size
                         else:
@@ -128,16 +123,15 @@ class JpegForensicsAnalyzer:
                     i += 2 + length
                 else:
                     # Skip other markers
-                    if i+3 < len(data):
-                         length = data[i+2] * 256 + data[i+3]
-                         i += 2 + length
-                    else:
-                        break
+                    (length,) = struct.unpack_from(">H", data, i + 2)
+                    i += 2 + length
             else:
-                i += 1
+                # Jump to the next 0xFF in C instead of stepping byte by byte
+                # through entropy-coded data
+                i = data.find(b"\xff", i)
         return q_tables
 
-    def _analyze_qt(self, q_tables: List[List[int]]) -> Dict:
+    def _analyze_qt(self, q_tables: List[np.ndarray]) -> Dict:
         """Analyze quantization tables for known signatures"""
         if not q_tables:
             return {"has_qt": False}
@@ -154,17 +148,23 @@ class JpegForensicsAnalyzer:
         
         # Heuristic: Check for flat tables (synthetic) or specific patterns
         # Example: All 1s (100% quality)
-        is_100_quality = all(x == 1 for x in lum_table)
+        is_100_quality = bool(np.all(lum_table == 1))
+        
+        # Stable across processes (unlike hash(), which is salted per run),
+        # so it can be looked up in a QT signature database
+        lum_table_hash = int.from_bytes(
+            hashlib.blake2b(lum_table.tobytes(), digest_size=8).digest(), "big"
+        )
         
         return {
             "has_qt": True,
-            "lum_table_hash": hash(tuple(lum_table)),
+            "lum_table_hash": lum_table_hash,
             "is_100_quality": is_100_quality,
             "is_photoshop_qt": is_photoshop, # Would need DB lookup
             "is_non_standard_qt": False # Would need Camera DB lookup
         }
 
-    def _estimate_quality(self, q_tables: List[List[int]]) -> int:
+    def _estimate_quality(self, q_tables: List[np.ndarray]) -> int:
         """Estimate JPEG quality factor from Quantization Tables"""
         if not q_tables:
             return 0
@@ -176,7 +176,7 @@ class JpegForensicsAnalyzer:
         if len(q_tables[0]) < 1:
             return 0
             
-        val = q_tables[0][0] # DC quantizer
+        val = int(q_tables[0][0]) # DC quantizer
         
         if val == 1: return 100
         if val <= 2: return 95
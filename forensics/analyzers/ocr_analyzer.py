@@ -7,6 +7,27 @@ from typing import Dict, Any, List
 
 logger = logging.getLogger(__name__)
 
+# Patterns compiled once at import; they run against every OCR result
+
+# Money amounts in format xx.xx or x,xxx.xx
+_AMOUNT_RE = re.compile(r'(\d{1,3}(?:,\d{3})*\.\d{2})')
+
+# Context keywords for amount
+_AMOUNT_KEYWORDS = ['amount', 'karn', 'money', 'bath', 'baht', 'thb', 'จำนวน', 'จำนวนเงิน', 'ยอดเงิน', 'โอน', 'จาก']
+_AMOUNT_KEYWORD_RE = re.compile('|'.join(map(re.escape, _AMOUNT_KEYWORDS)))
+
+# Fee / charge (ค่าธรรมเนียม) lines
+_FEE_RE = re.compile(r'fee|ธรรมเนียม')
+
+# Flexible backup for common banks (OCR may split or hyphenate names)
+_FLEXIBLE_BANK_RES = [
+    ("BBL", re.compile(r"bangkok\s*bank")),
+    ("KBANK", re.compile(r"k[\s-]*bank|kasikorn")),
+    ("SCB", re.compile(r"siam\s*commercial")),
+    ("KTB", re.compile(r"krung\s*thai")),
+    ("TTB", re.compile(r"tmb|thanachart")),
+]
+
 class OCRAnalyzer:
     """
     Analyzer for extracting text from images using Tesseract OCR.
@@ -14,14 +35,15 @@ class OCRAnalyzer:
     """
     
     def __init__(self):
+        # Plain lowercase names, matched as substrings in priority order
         self.bank_patterns = {
-            "KBANK": [r"kbank", r"kasikorn", r"กสิกร"],
-            "SCB": [r"scb", r"siam commercial", r"ไทยพาณิชย์"],
-            "KTB": [r"ktb", r"krungthai", r"กรุงไทย"],
-            "BBL": [r"bbl", r"bangkok bank", r"กรุงเทพ"],
-            "GSB": [r"gsb", r"government savings", r"ออมสิน"],
-            "TTB": [r"ttb", r"tmb", r"thanachart", r"ทหารไทย"],
-            "BAY": [r"bay", r"krungsri", r"กรุงศรี"],
+            "KBANK": ["kbank", "kasikorn", "กสิกร"],
+            "SCB": ["scb", "siam commercial", "ไทยพาณิชย์"],
+            "KTB": ["ktb", "krungthai", "กรุงไทย"],
+            "BBL": ["bbl", "bangkok bank", "กรุงเทพ"],
+            "GSB": ["gsb", "government savings", "ออมสิน"],
+            "TTB": ["ttb", "tmb", "thanachart", "ทหารไทย"],
+            "BAY": ["bay", "krungsri", "กรุงศรี"],
         }
         
     def analyze(self, image_bytes: bytes) -> Dict[str, Any]:
@@ -66,24 +88,19 @@ class OCRAnalyzer:
             
     def _detect_bank(self, text: str) -> str:
         # Check simple patterns first
+        # Substring tests beat both per-pattern regex searches and a single
+        # alternation regex, which re tries alternative by alternative at
+        # every position of the text
         for bank, patterns in self.bank_patterns.items():
             for pattern in patterns:
-                # Add flexible regex for spaces/hyphens e.g. "bangkok bank" -> "bangkok\s*bank"
-                # But simple substrings usually work. Let's try explicit flexible patterns or just standard search.
-                # If text comes from OCR 'kbank' might be 'k bank'.
-                if re.search(pattern, text):
+                # Simple substrings usually work; if text comes from OCR 'kbank'
+                # might be 'k bank', which the flexible backup below catches
+                if pattern in text:
                     return bank
                     
         # Flexible backup for common banks
-        flexible_patterns = {
-            "BBL": r"bangkok\s*bank",
-            "KBANK": r"k[\s-]*bank|kasikorn",
-            "SCB": r"siam\s*commercial",
-            "KTB": r"krung\s*thai",
-            "TTB": r"tmb|thanachart"
-        }
-        for bank, pattern in flexible_patterns.items():
-            if re.search(pattern, text):
+        for bank, pattern in _FLEXIBLE_BANK_RES:
+            if pattern.search(text):
                 return bank
                 
         return None
@@ -92,27 +109,24 @@ class OCRAnalyzer:
         lines = text.split('\n')
         amount_candidates = []
         
-        # Context keywords for amount
-        keywords = ['amount', 'karn', 'money', 'bath', 'baht', 'thb', 'จำนวน', 'จำนวนเงิน', 'ยอดเงิน', 'โอน', 'จาก']
-        
         # 1. Pattern Matching with Context
         for line in lines:
             line_lower = line.lower().strip()
-            # Find numbers in format xx.xx or x,xxx.xx
-            matches = re.findall(r'(\d{1,3}(?:,\d{3})*\.\d{2})', line)
+            # Find the first number in format xx.xx or x,xxx.xx
+            match = _AMOUNT_RE.search(line)
             
-            if matches:
-                val_str = matches[0].replace(',', '')
+            if match:
+                val_str = match.group(1).replace(',', '')
                 try:
                     val_float = float(val_str)
                     if val_float <= 0: continue
                     
                     # Check confidence based on keywords
-                    has_keyword = any(k in line_lower for k in keywords)
+                    has_keyword = _AMOUNT_KEYWORD_RE.search(line_lower) is not None
                     confidence = 2 if has_keyword else 1
                     
                     # Heuristic: If line contains "fee" or "charge" (ค่าธรรมเนียม), lower confidence
-                    if 'fee' in line_lower or 'ธรรมเนียม' in line_lower:
+                    if _FEE_RE.search(line_lower):
                         confidence = 0.5
                         
                     amount_candidates.append((val_float, confidence, val_str))
@@ -141,7 +155,7 @@ class OCRAnalyzer:
 
         # 3. Fallback: Search WHOLE text for any XX.XX number
         # If the line splitting failed, just grab all numbers 
-        matches = re.findall(r'(\d{1,3}(?:,\d{3})*\.\d{2})', text)
+        matches = _AMOUNT_RE.findall(text)
         valid_matches = []
         for m in matches:
              try:
@@ -4,11 +4,16 @@ Image Forensics Service - Main API
 FastAPI application for digital forensics analysis of images.
 """
 from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict
+import hashlib
 import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from analyzers.decoded_image import DecodedImage
 from analyzers.file_metadata import FileMetadataAnalyzer
 from analyzers.jpeg_forensics import JpegForensicsAnalyzer
 from analyzers.noise_residual import NoiseResidualAnalyzer
@@ -35,6 +40,37 @@ fft_analyzer = FrequencyDomainAnalyzer()
 ocr_analyzer = OCRAnalyzer()
 ela_analyzer = ELAAnalyzer()
 
+# The analyzers are independent and spend most of their time in
+# NumPy/SciPy/Pillow/pywt/OpenCV code (or the tesseract subprocess) that
+# releases the GIL, so threads run them concurrently without pickling
+ANALYZER_WORKERS = 4
+_analyzer_pool = ThreadPoolExecutor(max_workers=ANALYZER_WORKERS, thread_name_prefix="analyzer")
+
+
+def analyze_all(image_bytes: bytes) -> Dict[str, Dict]:
+    """
+    Run every analyzer over the same image concurrently
+    
+    Returns:
+        dict of analyzer name -> that analyzer's result
+    """
+    # Decode once for the pixel-level analyzers; if this fails they
+    # decode on their own and report the error in their results
+    try:
+        decoded = DecodedImage.from_bytes(image_bytes)
+    except Exception:
+        decoded = None
+    
+    futures = {
+        "metadata": _analyzer_pool.submit(metadata_analyzer.analyze, image_bytes),
+        "jpeg": _analyzer_pool.submit(jpeg_analyzer.analyze, image_bytes),
+        "noise": _analyzer_pool.submit(noise_analyzer.analyze, image_bytes, decoded),
+        "fft": _analyzer_pool.submit(fft_analyzer.analyze, image_bytes, decoded),
+        "ocr": _analyzer_pool.submit(ocr_analyzer.analyze, image_bytes),
+        "ela": _analyzer_pool.submit(ela_analyzer.analyze, image_bytes),
+    }
+    return {name: future.result() for name, future in futures.items()}
+
 # Track metrics
 metrics = {
     "requests_total": 0,
@@ -52,6 +88,17 @@ class ForensicsResponse(BaseModel):
     ocr_result: Optional[Dict] = Field(None, description="Extracted text and data from OCR")
 
 
+# Recent results keyed by SHA-256 of the image bytes, so re-submitted
+# images skip the full analyzer pipeline
+RESULT_CACHE_SIZE = 256
+_result_cache: "OrderedDict[bytes, ForensicsResponse]" = OrderedDict()
+
+
+def clear_result_cache():
+    """Drop all cached analysis results"""
+    _result_cache.clear()
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -81,25 +128,25 @@ async def analyze_image(file: UploadFile = File(...)):
         if len(image_bytes) == 0:
             raise HTTPException(status_code=400, detail="Empty file")
         
-        logger.info(f"Analyzing image: {file.filename}, size: {len(image_bytes)} bytes")
-        
-        # Phase 1: File & Metadata Analysis
-        metadata_result = metadata_analyzer.analyze(image_bytes)
+        digest = hashlib.sha256(image_bytes).digest()
+        cached = _result_cache.get(digest)
+        if cached is not None:
+            _result_cache.move_to_end(digest)
+            metrics["requests_by_result"][cached.forensic_result] += 1
+            logger.info(f"Cached analysis for {file.filename}: {cached.forensic_result}")
+            return cached
         
-        # Phase 2: JPEG Forensics
-        jpeg_result = jpeg_analyzer.analyze(image_bytes)
+        logger.info(f"Analyzing image: {file.filename}, size: {len(image_bytes)} bytes")
         
-        # Phase 3: Noise Residual Analysis
-        noise_result = noise_analyzer.analyze(image_bytes)
-        
-        # Phase 4: Frequency Domain Analysis
-        fft_result = fft_analyzer.analyze(image_bytes)
-
-        # Phase 5: OCR Extraction
-        ocr_result = ocr_analyzer.analyze(image_bytes)
-
-        # Phase 6: ELA Analysis
-        ela_result = ela_analyzer.analyze(image_bytes)
+        # Phases 1-6: metadata, JPEG, noise, frequency, OCR and ELA run
+        # concurrently, off the event loop
+        results = await run_in_threadpool(analyze_all, image_bytes)
+        metadata_result = results["metadata"]
+        jpeg_result = results["jpeg"]
+        noise_result = results["noise"]
+        fft_result = results["fft"]
+        ocr_result = results["ocr"]
+        ela_result = results["ela"]
         
         # Combine results
         all_features = {
@@ -139,7 +186,7 @@ async def analyze_image(file: UploadFile = File(...)):
         
         logger.info(f"Analysis complete: {result}, score: {final_score:.2f}")
         
-        return ForensicsResponse(
+        response = ForensicsResponse(
             forensic_result=result,
             score=final_score,
             reasons=all_warnings,
@@ -147,6 +194,18 @@ async def analyze_image(file: UploadFile = File(...)):
             ocr_result=ocr_result
         )
         
+        # Degraded results (an analyzer failed or timed out) are not cached,
+        # so the next submission of the same image gets a fresh attempt
+        failed = [name for name, result in results.items() if "error" in result]
+        if failed:
+            logger.warning(f"Not caching result for {file.filename}; failed analyzers: {failed}")
+        else:
+            _result_cache[digest] = response
+            if len(_result_cache) > RESULT_CACHE_SIZE:
+                _result_cache.popitem(last=False)
+        
+        return response
+        
     except HTTPException:
         raise
     except Exception as e:
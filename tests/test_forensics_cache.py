@@ -0,0 +1,99 @@
+"""
+Tests for the forensics service result cache
+
+The forensics service is a separate app under forensics/ that imports its
+analyzers as top-level modules, so its directory is put on sys.path.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "forensics"))
+import main as forensics_main  # noqa: E402
+
+
+def _analyzer_results(ocr_error: bool = False) -> dict:
+    clean = {"features": {}, "warnings": [], "score": 0.0}
+    ocr = {"raw_text": "", "extracted_data": {"bank": None, "amount": None}}
+    if ocr_error:
+        ocr["error"] = "tesseract timed out"
+    return {
+        "metadata": dict(clean),
+        "jpeg": dict(clean),
+        "noise": dict(clean),
+        "fft": dict(clean),
+        "ocr": ocr,
+        "ela": {"ela_score": 0.0},
+    }
+
+
+@pytest.fixture
+def analyze_calls(monkeypatch):
+    """Replace the analyzer pipeline with a stub that counts calls per image"""
+    calls = []
+    state = {"ocr_error": False}
+
+    def fake_analyze_all(image_bytes):
+        calls.append(image_bytes)
+        return _analyzer_results(ocr_error=state["ocr_error"])
+
+    monkeypatch.setattr(forensics_main, "analyze_all", fake_analyze_all)
+    forensics_main.clear_result_cache()
+    yield calls, state
+    forensics_main.clear_result_cache()
+
+
+def _post(client: TestClient, content: bytes):
+    response = client.post(
+        "/forensics/analyze",
+        files={"file": ("slip.jpg", content, "image/jpeg")}
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestForensicsResultCache:
+    """Test the content-hash result cache in the forensics API"""
+
+    def test_cache_hit_skips_analysis(self, analyze_calls):
+        """Re-submitting the same bytes returns the cached response"""
+        calls, _ = analyze_calls
+        client = TestClient(forensics_main.app)
+
+        first = _post(client, b"image-a")
+        second = _post(client, b"image-a")
+
+        assert first == second
+        assert calls == [b"image-a"]
+
+    def test_lru_eviction(self, analyze_calls, monkeypatch):
+        """The least recently used entry is evicted at capacity"""
+        calls, _ = analyze_calls
+        monkeypatch.setattr(forensics_main, "RESULT_CACHE_SIZE", 2)
+        client = TestClient(forensics_main.app)
+
+        _post(client, b"image-a")
+        _post(client, b"image-b")
+        _post(client, b"image-a")  # hit; image-b is now least recent
+        _post(client, b"image-c")  # evicts image-b
+        _post(client, b"image-a")  # still cached
+        _post(client, b"image-b")  # analyzed again
+
+        assert calls == [b"image-a", b"image-b", b"image-c", b"image-b"]
+
+    def test_degraded_result_not_cached(self, analyze_calls):
+        """A response with a failed analyzer is recomputed next time"""
+        calls, state = analyze_calls
+        client = TestClient(forensics_main.app)
+
+        state["ocr_error"] = True
+        degraded = _post(client, b"image-a")
+        state["ocr_error"] = False
+        recovered = _post(client, b"image-a")
+        _post(client, b"image-a")
+
+        assert "error" in degraded["ocr_result"]
+        assert "error" not in recovered["ocr_result"]
+        assert calls == [b"image-a", b"image-a"]
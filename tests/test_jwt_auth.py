@@ -66,3 +66,37 @@ def test_long_password_truncation():
     except ValueError:
         # If it raises ValueError, we should handle it or ensure we don't use long passwords
         pytest.skip("Bcrypt limitation hit as expected")
+
+@pytest.mark.asyncio
+async def test_password_hashing_async():
+    """Test async password helpers run bcrypt off the event loop"""
+    from app.utils.jwt_utils import hash_password_async, verify_password_async
+    
+    hashed = await hash_password_async("admin123")
+    
+    assert await verify_password_async("admin123", hashed) is True
+    assert await verify_password_async("wrong_password", hashed) is False
+    assert verify_password("admin123", hashed) is True
+
+def test_verified_token_cache():
+    """Test verified payloads are cached by token digest and bounded by exp"""
+    import time
+    from app.utils.jwt_utils import VerifiedTokenCache
+    
+    cache = VerifiedTokenCache(maxsize=2, ttl=60)
+    cache.put("token-a", {"sub": "a", "exp": time.time() + 120})
+    cache.put("token-b", {"sub": "b", "exp": time.time() - 1})
+    
+    payload = cache.get("token-a")
+    assert payload["sub"] == "a"
+    payload["sub"] = "mutated"
+    assert cache.get("token-a")["sub"] == "a"
+    
+    # Already past exp, so never served
+    assert cache.get("token-b") is None
+    
+    # LRU eviction beyond maxsize
+    cache.put("token-c", {"sub": "c"})
+    cache.put("token-d", {"sub": "d"})
+    assert cache.get("token-a") is None
+    assert cache.get("token-d")["sub"] == "d"
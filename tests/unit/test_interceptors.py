@@ -0,0 +1,148 @@
+"""
+Unit tests for request/response interceptors
+
+Tests middleware behaviour around request bodies and log batching.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.security import mask_sensitive_data
+from app.utils import interceptors
+from app.utils.interceptors import (
+    DebugRequestInterceptor,
+    RequestLogBuffer,
+    RequestResponseInterceptor
+)
+
+
+@pytest.fixture
+def flushed_batches(monkeypatch):
+    """Collect the records of every batch the buffer emits"""
+    batches = []
+    monkeypatch.setattr(
+        interceptors.batch_logger,
+        "info",
+        lambda message, count, records: batches.append(records)
+    )
+    return batches
+
+
+def _debug_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(DebugRequestInterceptor)
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        body = await request.json()
+        return {"body": body, "disconnected": await request.is_disconnected()}
+
+    @app.post("/stream")
+    async def stream(request: Request):
+        body = await request.body()
+
+        async def chunks():
+            yield body
+            yield b"-done"
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    return app
+
+
+class TestDebugRequestInterceptor:
+    """Test DebugRequestInterceptor"""
+
+    def test_body_still_readable_downstream(self):
+        """Route can read the body and check for disconnect after debug logging"""
+        client = TestClient(_debug_app())
+
+        response = client.post("/echo", json={"message": "hello"})
+
+        assert response.status_code == 200
+        assert response.json() == {"body": {"message": "hello"}, "disconnected": False}
+
+    def test_streaming_response_after_body_read(self):
+        """Streaming responses are delivered in full on POST routes"""
+        client = TestClient(_debug_app())
+
+        response = client.post("/stream", content=b'{"a": 1}')
+
+        assert response.status_code == 200
+        assert response.text == '{"a": 1}-done'
+
+
+class TestMaskSensitiveData:
+    """Test mask_sensitive_data"""
+
+    def test_url_mask_stops_at_json_quote(self):
+        """Masking a URL in compact JSON keeps the following fields"""
+        masked = mask_sensitive_data('{"url":"https://evil.example/x","message":"hi"}')
+
+        assert masked == '{"url":"https://[MASKED_URL]","message":"hi"}'
+
+
+class TestRequestLogBuffer:
+    """Test RequestLogBuffer"""
+
+    @pytest.mark.asyncio
+    async def test_drain_flushes_while_idle(self, flushed_batches):
+        """Buffered records are written after the interval without new requests"""
+        buffer = RequestLogBuffer(flush_interval=0.05)
+        buffer.start()
+        try:
+            buffer.append("req-1", "GET", "/health", 200, 1.5)
+            assert flushed_batches == []
+
+            await asyncio.sleep(0.2)
+
+            assert len(buffer) == 0
+            assert flushed_batches == [{
+                "request_id": ["req-1"],
+                "method": ["GET"],
+                "path": ["/health"],
+                "status_code": [200],
+                "duration_ms": [1.5],
+            }]
+        finally:
+            await buffer.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_remaining_records(self, flushed_batches):
+        """Records still buffered at shutdown are written by stop()"""
+        buffer = RequestLogBuffer(flush_interval=60)
+        buffer.start()
+        buffer.append("req-1", "GET", "/a", 200, 1.0)
+        buffer.append("req-2", "POST", "/b", 201, 2.0)
+
+        await buffer.stop()
+
+        assert len(buffer) == 0
+        assert [batch["request_id"] for batch in flushed_batches] == [["req-1", "req-2"]]
+
+    def test_flushed_on_app_shutdown(self, flushed_batches):
+        """Buffer tied to the app lifespan flushes when the app stops"""
+        buffer = RequestLogBuffer(flush_interval=60)
+
+        @asynccontextmanager
+        async def lifespan(app):
+            buffer.start()
+            yield
+            await buffer.stop()
+
+        app = FastAPI(lifespan=lifespan)
+        app.add_middleware(RequestResponseInterceptor, log_buffer=buffer)
+
+        @app.get("/ping")
+        async def ping():
+            return {"ok": True}
+
+        with TestClient(app) as client:
+            client.get("/ping")
+            client.get("/ping")
+
+        assert sum(len(batch["path"]) for batch in flushed_batches) == 2
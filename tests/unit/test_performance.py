@@ -0,0 +1,226 @@
+"""
+Unit tests for performance monitoring
+
+Tests the ring-buffer metric store, streaming statistics and
+PerformanceMonitor windows against exact reference statistics.
+"""
+import time
+from datetime import datetime, UTC
+
+import numpy as np
+import pytest
+
+from app.utils.performance import MetricStore, PerformanceMonitor, RunningStats
+
+SECOND_NS = 1_000_000_000
+
+
+def exact_stats(durations) -> dict:
+    """Reference statistics by full sort (nearest-rank percentiles)"""
+    data = np.sort(np.asarray(durations, dtype=np.float64))
+    n = data.size
+    return {
+        "count": n,
+        "min_ms": data[0],
+        "max_ms": data[-1],
+        "mean_ms": data.mean(),
+        "median_ms": (data[(n - 1) // 2] + data[n // 2]) / 2,
+        "p95_ms": data[min(int(0.95 * n), n - 1)],
+        "p99_ms": data[min(int(0.99 * n), n - 1)],
+    }
+
+
+def assert_stats_equal(actual: dict, expected: dict):
+    for key, value in expected.items():
+        assert actual[key] == pytest.approx(value), key
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """Monotonic clock that advances one second per call"""
+    state = {"now": 1_000 * SECOND_NS}
+
+    def monotonic_ns():
+        state["now"] += SECOND_NS
+        return state["now"]
+
+    monkeypatch.setattr(time, "monotonic_ns", monotonic_ns)
+    return state
+
+
+def wall_time(monitor: PerformanceMonitor, stamp_ns: int) -> datetime:
+    """Wall-clock datetime of a monotonic stamp as seen by monitor"""
+    return datetime.fromtimestamp((stamp_ns + monitor._wall_offset_ns) / SECOND_NS, UTC)
+
+
+class TestMetricStore:
+    """Test MetricStore"""
+
+    def test_wraps_around_at_capacity(self):
+        """Oldest entries are overwritten and order is preserved"""
+        store = MetricStore(5)
+        for i in range(8):
+            store.append(f"op{i % 2}", float(i), i, {})
+
+        assert len(store) == 5
+        assert store.ordered(store.durations).tolist() == [3.0, 4.0, 5.0, 6.0, 7.0]
+        assert store.ordered(store.timestamps).tolist() == [3, 4, 5, 6, 7]
+        assert [store.names[c] for c in store.ordered(store.name_codes)] == [
+            "op1", "op0", "op1", "op0", "op1"
+        ]
+
+    def test_window_straddling_wrap_point(self):
+        """Time windows are correct for every cutoff across the wrap"""
+        store = MetricStore(5)
+        for i in range(8):
+            store.append("op", float(i), i * 10, {})
+
+        # Slots now hold stamps [50, 60, 70, 30, 40]; the oldest is mid-array
+        for cutoff in range(0, 90, 5):
+            window = store.window(cutoff)
+            expected = [float(i) for i in range(3, 8) if i * 10 >= cutoff]
+            assert store.ordered(store.durations)[window].tolist() == expected
+
+    def test_empty_window(self):
+        """A cutoff after the newest entry selects nothing"""
+        store = MetricStore(4)
+        for i in range(6):
+            store.append("op", float(i), i, {})
+
+        window = store.window(100)
+        assert store.ordered(store.durations)[window].size == 0
+
+    def test_drop_before(self):
+        """Dropping a prefix keeps the remaining entries in order"""
+        store = MetricStore(5)
+        for i in range(8):
+            store.append("op", float(i), i, {})
+
+        assert store.drop_before(6) == 3
+        assert store.ordered(store.durations).tolist() == [6.0, 7.0]
+
+
+class TestRunningStats:
+    """Test RunningStats"""
+
+    def test_estimates_within_bucket_error(self):
+        """Exact count/min/max/mean; percentiles within the 2% bucket width"""
+        rng = np.random.default_rng(0)
+        durations = rng.lognormal(mean=3.0, sigma=1.5, size=5000)
+
+        stats = RunningStats()
+        for d in durations:
+            stats.add(float(d))
+        snapshot = stats.snapshot()
+        expected = exact_stats(durations)
+
+        for key in ("count", "min_ms", "max_ms", "mean_ms"):
+            assert snapshot[key] == pytest.approx(expected[key])
+        for key in ("median_ms", "p95_ms", "p99_ms"):
+            assert snapshot[key] == pytest.approx(expected[key], rel=RunningStats.GROWTH - 1)
+
+    def test_from_array_matches_incremental(self):
+        """Batch construction gives the same histogram as adding one by one"""
+        durations = np.array([0.001, 0.01, 0.5, 3.0, 3.0, 250.0, 1e9])
+
+        incremental = RunningStats()
+        for d in durations:
+            incremental.add(float(d))
+        batch = RunningStats.from_array(durations)
+
+        assert np.array_equal(incremental.histogram, batch.histogram)
+        assert batch.snapshot() == pytest.approx(incremental.snapshot())
+
+
+class TestPerformanceMonitor:
+    """Test PerformanceMonitor statistics windows"""
+
+    @pytest.mark.asyncio
+    async def test_stats_after_wrap_around(self, fake_clock):
+        """get_stats covers exactly the retained metrics"""
+        rng = np.random.default_rng(1)
+        durations = rng.uniform(1, 500, size=137)
+        monitor = PerformanceMonitor(alert_threshold_ms=1e9, max_metrics=50)
+        for i, d in enumerate(durations):
+            await monitor.record("odd" if i % 2 else "even", float(d))
+
+        retained = durations[-50:]
+        odd = np.arange(durations.size - 50, durations.size) % 2 == 1
+        assert_stats_equal(await monitor.get_stats(), exact_stats(retained))
+        assert_stats_equal(await monitor.get_stats(name="odd"), exact_stats(retained[odd]))
+        assert len(monitor.metrics) == 50
+
+    @pytest.mark.asyncio
+    async def test_since_straddling_wrap_point(self, fake_clock):
+        """A since cutoff inside the wrapped buffer selects the newer metrics"""
+        rng = np.random.default_rng(2)
+        durations = rng.uniform(1, 500, size=137)
+        monitor = PerformanceMonitor(alert_threshold_ms=1e9, max_metrics=50)
+        stamps = []
+        for i, d in enumerate(durations):
+            await monitor.record("odd" if i % 2 else "even", float(d))
+            stamps.append(fake_clock["now"])
+
+        # Halfway between the stamps of metrics 109 and 110; the ring buffer
+        # wrapped at metric 100, so the window starts in the middle of it
+        since = wall_time(monitor, stamps[109] + SECOND_NS // 2)
+        window = durations[110:]
+        odd = np.arange(110, durations.size) % 2 == 1
+
+        assert_stats_equal(await monitor.get_stats(since=since), exact_stats(window))
+
+        aggregated = await monitor.get_aggregated_stats(since=since)
+        assert_stats_equal(aggregated["even"], exact_stats(window[~odd]))
+        assert_stats_equal(aggregated["odd"], exact_stats(window[odd]))
+
+    @pytest.mark.asyncio
+    async def test_empty_window(self, fake_clock):
+        """A since cutoff after every metric yields empty stats"""
+        monitor = PerformanceMonitor(alert_threshold_ms=1e9, max_metrics=10)
+        for i in range(15):
+            await monitor.record("op", float(i))
+
+        since = wall_time(monitor, fake_clock["now"] + SECOND_NS)
+        assert await monitor.get_stats(since=since) == {"count": 0, "name": None}
+        assert await monitor.get_aggregated_stats(since=since) == {}
+        assert await monitor.get_stats(name="missing") == {"count": 0, "name": "missing"}
+
+    @pytest.mark.asyncio
+    async def test_wall_clock_step_back_keeps_order(self, monkeypatch):
+        """Metrics stay in time order when the wall clock is set back"""
+        monitor = PerformanceMonitor(alert_threshold_ms=1e9, max_metrics=10)
+        await monitor.record("op", 1.0)
+        real_time_ns = time.time_ns
+        monkeypatch.setattr(time, "time_ns", lambda: real_time_ns() - 3600 * SECOND_NS)
+        await monitor.record("op", 2.0)
+
+        timestamps = monitor._store.ordered(monitor._store.timestamps)
+        assert np.all(np.diff(timestamps) >= 0)
+        assert (await monitor.get_stats())["count"] == 2
+
+    @pytest.mark.asyncio
+    async def test_running_stats_follow_evictions(self, fake_clock):
+        """Running aggregates cover the same retained metrics as the exact paths"""
+        rng = np.random.default_rng(3)
+        monitor = PerformanceMonitor(alert_threshold_ms=1e9, max_metrics=50)
+        names = ["startup"] * 20 + [f"op{i % 3}" for i in range(117)]
+        durations = rng.lognormal(mean=3.0, sigma=1.0, size=len(names))
+        # The extremes of op1 are evicted early on
+        durations[21], durations[24] = 0.5, 9000.0
+        for name, d in zip(names, durations):
+            await monitor.record(name, float(d))
+
+        running = await monitor.get_aggregated_stats()
+        exact = await monitor.get_aggregated_stats(since=datetime(1970, 1, 2, tzinfo=UTC))
+
+        assert "startup" not in running
+        assert running.keys() == exact.keys() == {"op0", "op1", "op2"}
+        assert sum(s["count"] for s in running.values()) == 50
+        assert (await monitor.get_stats())["count"] == 50
+        for name in running:
+            for key in ("count", "min_ms", "max_ms", "mean_ms"):
+                assert running[name][key] == pytest.approx(exact[name][key]), (name, key)
+            for key in ("median_ms", "p95_ms", "p99_ms"):
+                assert running[name][key] == pytest.approx(
+                    exact[name][key], rel=RunningStats.GROWTH - 1
+                ), (name, key)
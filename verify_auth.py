@@ -3,7 +3,7 @@ import os
 import logging
 from app.database import SessionLocal, init_db
 from app.models.database import User, UserRole
-from app.routes.auth import hash_password, verify_password
+from app.utils.jwt_utils import hash_password, verify_password
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)